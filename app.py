@@ -1,12 +1,14 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
-from datetime import datetime, timedelta
+from datetime import timedelta
+import codecs
+import os
+import json
+import time
 import requests
 from io import StringIO
 import numpy as np
-from scipy import stats
 
 # 페이지 설정
 st.set_page_config(
@@ -134,125 +136,200 @@ st.markdown("""
 st.title("📺 종편 4사 메인뉴스 시청률 대시보드(전국)")
 st.markdown("---")
 
+# 데이터 캐시 설정
+CACHE_TTL = 300  # 초
+SNAPSHOT_DIR = ".cache"
+SNAPSHOT_DATA_PATH = os.path.join(SNAPSHOT_DIR, "ratings.feather")
+SNAPSHOT_INFO_PATH = os.path.join(SNAPSHOT_DIR, "info.json")
+
+# 디스크 스냅샷 읽기 (서버 재시작 후에도 TTL 이내면 재다운로드 생략, Feather는 파싱 없이 바로 로드)
+def read_snapshot():
+    try:
+        if time.time() - os.path.getmtime(SNAPSHOT_INFO_PATH) < CACHE_TTL:
+            with open(SNAPSHOT_INFO_PATH, encoding='utf-8') as f:
+                snapshot_info = json.load(f)
+            df = pd.read_feather(SNAPSHOT_DATA_PATH)
+            df = df.set_index('date', drop=False).rename_axis(None)
+            return df, snapshot_info
+    except Exception:
+        pass
+    return None
+
+# 디스크 스냅샷 저장 (임시 파일에 쓴 뒤 교체, 정보 파일을 마지막에 써서 완성된 스냅샷만 읽히도록)
+def write_snapshot(df, snapshot_info):
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        tmp_data_path = f"{SNAPSHOT_DATA_PATH}.tmp"
+        df.reset_index(drop=True).to_feather(tmp_data_path)
+        os.replace(tmp_data_path, SNAPSHOT_DATA_PATH)
+        
+        tmp_info_path = f"{SNAPSHOT_INFO_PATH}.tmp"
+        with open(tmp_info_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot_info, f, ensure_ascii=False)
+        os.replace(tmp_info_path, SNAPSHOT_INFO_PATH)
+    except Exception:
+        pass
+
+# 디스크 스냅샷 삭제 (데이터 새로고침용)
+def clear_snapshot():
+    for path in (SNAPSHOT_INFO_PATH, SNAPSHOT_DATA_PATH):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+# 요일 이름 (월~일 순서, 요일 번호 0~6과 같은 순서)
+WEEKDAY_KOREAN = ['월요일', '화요일', '수요일', '목요일', '금요일', '토요일', '일요일']
+
+# 요일 필터별 요일 번호 (0=월요일, 6=일요일)
+DAY_FILTER_WEEKDAYS = {"주중": range(0, 5), "주말": range(5, 7), "(주중+주말)": range(0, 7)}
+
+# 기간 선택지별 개월 수 ("전체"는 없음 = 기간 제한 없음)
+PERIOD_MONTHS = {"최근 1개월": 1, "최근 3개월": 3, "최근 6개월": 6, "최근 9개월": 9, "최근 12개월": 12}
+
+# 기간 선택지별 시작일 (최신 날짜 기준, 데이터 로딩 시 한 번 계산해 재사용)
+def build_period_starts(latest_date):
+    return {period: latest_date - pd.DateOffset(months=months) for period, months in PERIOD_MONTHS.items()}
+
+# 날짜 표시 문자열 (같은 날짜/형식은 세션 동안 한 번만 포맷)
+def format_date(date, fmt):
+    formatted = st.session_state.setdefault('_date_strings', {})
+    key = (date, fmt)
+    if key not in formatted:
+        formatted[key] = date.strftime(fmt)
+    return formatted[key]
+
+# 로딩 정보 구성 (다운로드 직후와 스냅샷 복원 시 공통)
+def build_loading_info(df, encoding_used, date_col, numeric_columns, from_snapshot=False):
+    return {
+        'from_snapshot': from_snapshot,  # 디스크 스냅샷에서 복원했으면 True (네트워크 요청 없음)
+        'encoding': encoding_used,
+        'rows': len(df),
+        'columns': len(df.columns),
+        'column_names': list(df.columns),
+        'date_column': date_col,
+        'numeric_columns': numeric_columns,
+        'date_range': (df['date'].min(), df['date'].max()),
+        'latest_date': df['date'].max(),
+        'period_starts': build_period_starts(df['date'].max()),
+        'preview': df.head(10)  # 원본 데이터 미리보기 (로딩 시 한 번만 잘라 둠)
+    }
+
+# 구글 시트 CSV 주소 및 인코딩 후보 (시도 순서)
+DATA_URL = "https://docs.google.com/spreadsheets/d/1uv9gNT9TDEu2qtPPOnQlhiznnb4lxmogwQFWmQbclIc/export?format=csv&gid=0"
+CSV_ENCODINGS = ['utf-8-sig', 'cp949', 'euc-kr']
+CSV_ENCODING_MARKERS = ('뉴스', '조선', '날짜')  # 올바르게 디코딩되면 헤더에 보이는 한글
+
+# 샘플 바이트로 인코딩 감지 (엄격 디코딩 성공 + 한글 헤더가 보이는 첫 후보)
+def _sniff_encoding(sample):
+    fallback = None
+    for encoding in CSV_ENCODINGS:
+        try:
+            # 샘플 끝에서 잘린 멀티바이트 문자는 오류로 보지 않음
+            text = codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+        except UnicodeDecodeError:
+            continue
+        if any(marker in text for marker in CSV_ENCODING_MARKERS):
+            return encoding
+        if fallback is None:
+            fallback = encoding
+    return fallback or 'utf-8'
+
+# HTTP 세션 (스크립트 재실행과 상관없이 프로세스당 하나를 재사용해 keep-alive 연결 유지)
+@st.cache_resource(show_spinner=False)
+def get_http_session():
+    session = requests.Session()
+    session.mount('https://', requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=1))
+    return session
+
+# CSV 원본 바이트 다운로드 (파싱 로직이 바뀌어도 재다운로드하지 않도록 따로 캐시)
+@st.cache_data(ttl=CACHE_TTL, max_entries=1, show_spinner=False)
+def _fetch_csv_bytes(url):
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+        'Accept': 'text/csv,application/csv,text/plain,*/*',
+        'Accept-Charset': 'utf-8,euc-kr,cp949'
+    }
+    
+    # 연결은 빨리 실패, 응답 읽기는 최대 10초 대기
+    response = get_http_session().get(url, timeout=(3.05, 10), headers=headers)
+    response.raise_for_status()
+    return response.content
+
 # 데이터 로딩 함수
-@st.cache_data(ttl=300)
+@st.cache_data(ttl=CACHE_TTL, max_entries=4, show_spinner=False)
 def load_data():
+    snapshot = read_snapshot()
+    if snapshot is not None:
+        df, snapshot_info = snapshot
+        numeric_columns = snapshot_info['numeric_columns']
+        return df, numeric_columns, build_loading_info(df, snapshot_info['encoding'], snapshot_info['date_column'], numeric_columns, from_snapshot=True)
+    
     try:
-        url = "https://docs.google.com/spreadsheets/d/1uv9gNT9TDEu2qtPPOnQlhiznnb4lxmogwQFWmQbclIc/export?format=csv&gid=0"
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'text/csv,application/csv,text/plain,*/*',
-            'Accept-Charset': 'utf-8,euc-kr,cp949'
-        }
+        raw = _fetch_csv_bytes(DATA_URL)
         
-        response = requests.get(url, timeout=10, headers=headers)
-        response.raise_for_status()
+        # 인코딩 처리 (앞부분 4KB 샘플로 감지한 인코딩부터 전체를 엄격 디코딩, 실패하면 나머지 후보 순서대로)
+        sniffed = _sniff_encoding(raw[:4096])
+        for encoding_used in [sniffed] + [encoding for encoding in CSV_ENCODINGS if encoding != sniffed]:
+            try:
+                text_content = raw.decode(encoding_used)
+                break
+            except UnicodeDecodeError:
+                continue
+        else:
+            # 모든 후보가 실패하면 깨진 문자만 대체해서 읽음
+            encoding_used = 'utf-8'
+            text_content = raw.decode('utf-8', errors='replace')
         
-        # 인코딩 처리
-        df = None
-        encoding_used = None
+        # 헤더만 먼저 읽어 컬럼 타입 지정 (날짜는 문자열, 시청률은 float32)
+        header_columns = pd.read_csv(StringIO(text_content), nrows=0).columns
+        raw_date_col = header_columns[0]
+        dtypes = {col: 'float32' for col in header_columns[1:]}
+        dtypes[raw_date_col] = str
         
         try:
-            response_bytes = requests.get(url, timeout=10, headers=headers)
-            response_bytes.raise_for_status()
-            
-            encodings = ['utf-8', 'utf-8-sig', 'cp949', 'euc-kr', 'iso-8859-1']
-            
-            for encoding in encodings:
-                try:
-                    text_content = response_bytes.content.decode(encoding)
-                    df = pd.read_csv(StringIO(text_content))
-                    
-                    has_korean = any('뉴스' in str(col) or 'JTBC' in str(col) or 'MBN' in str(col) or 'TV조선' in str(col) for col in df.columns)
-                    has_garbled = any('ë' in str(col) or 'ì' in str(col) or 'ì¡' in str(col) for col in df.columns)
-                    
-                    if has_korean or not has_garbled:
-                        encoding_used = encoding
-                        break
-                        
-                except (UnicodeDecodeError, pd.errors.EmptyDataError) as e:
-                    continue
-                    
-        except Exception as e:
-            response = requests.get(url, timeout=10, headers=headers)
-            response.raise_for_status()
-            if response.encoding and response.encoding.lower() != 'utf-8':
-                response.encoding = 'utf-8'
-            df = pd.read_csv(StringIO(response.text))
-            encoding_used = "fallback"
-        
-        # 한글 복구
-        def fix_korean_columns(df):
-            column_mapping = {
-                'ë´ì¤A': '뉴스A',
-                'JTBCë´ì¤ë£¸': 'JTBC뉴스룸', 
-                'MBNë´ì¤7': 'MBN뉴스7',
-                'TVì¡°ì ë´ì¤9': 'TV조선뉴스9',
-                'ë´ì¤A(2049)': '뉴스A(2049)',
-                'JTBCë´ì¤ë£¸(2049)': 'JTBC뉴스룸(2049)',
-                'MBNë´ì¤7(2049)': 'MBN뉴스7(2049)', 
-                'TVì¡°ì ë´ì¤9(2049)': 'TV조선뉴스9(2049)',
-                'ë ì§': '날짜'
-            }
-            
-            df = df.rename(columns=column_mapping)
-            
-            new_columns = []
-            for col in df.columns:
-                new_col = col
-                replacements = {
-                    'ë´ì¤': '뉴스', 'ë£¸': '룸', 'ì¡°ì ': '조선', 'ì§': '지',
-                    'ì': '', 'ë': '', '¤': '', '¸': '', '£': ''
-                }
-                for old, new in replacements.items():
-                    new_col = new_col.replace(old, new)
-                new_columns.append(new_col)
-            
-            df.columns = new_columns
-            return df
-        
-        df = fix_korean_columns(df)
+            df = pd.read_csv(StringIO(text_content), dtype=dtypes)
+            typed_read = True
+        except ValueError:
+            # 숫자가 아닌 값이 섞여 있으면 타입 지정 없이 읽은 뒤 변환
+            df = pd.read_csv(StringIO(text_content), dtype={raw_date_col: str})
+            typed_read = False
         
         # 날짜 처리
         date_col = df.columns[0]
         df['original_date'] = df[date_col]
         
-        try:
-            df['date'] = pd.to_datetime(df[date_col].astype(str), format='%y%m%d', errors='coerce')
-        except:
-            df['date'] = pd.to_datetime(df[date_col], errors='coerce')
+        df['date'] = pd.to_datetime(df[date_col], format='%y%m%d', errors='coerce')
         
         if df['date'].isna().all():
             df['date'] = pd.date_range(start='2023-01-01', periods=len(df), freq='D')
         
+        # 날짜를 읽지 못한 행은 제외 (요일 필터에 섞이지 않고 날짜 인덱스도 단조 증가로 유지)
+        df = df[df['date'].notna()]
+        
         # 요일 추가
-        df['weekday'] = df['date'].dt.dayofweek  # 0=월요일, 6=일요일
-        df = df.sort_values('date').reset_index(drop=True)
+        df['weekday'] = df['date'].dt.dayofweek.astype(np.int8)  # 0=월요일, 6=일요일
+        df['is_weekday'] = df['weekday'].between(0, 4)  # 월~금
+        # 요일 번호를 그대로 코드로 쓰는 한글 범주형
+        df['weekday_name'] = pd.Categorical.from_codes(df['weekday'], categories=WEEKDAY_KOREAN, ordered=True)
+        # 정렬된 DatetimeIndex로 기간 슬라이스를 이진 탐색으로 처리 (date 컬럼은 유지)
+        df = df.sort_values('date').set_index('date', drop=False).rename_axis(None)
         
-        # 숫자 컬럼 처리
-        numeric_columns = []
-        exclude_columns = ['date', 'original_date', '날짜', 'Date', 'DATE', 'weekday']
+        # 숫자 컬럼 처리 (타입 지정 읽기에 실패한 경우에만 변환)
+        exclude_columns = ['date', 'original_date', '날짜', 'Date', 'DATE', 'weekday', 'is_weekday', 'weekday_name']
         
-        for col in df.columns:
-            if col not in exclude_columns:
-                try:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-                    if not df[col].isna().all():
-                        numeric_columns.append(col)
-                except:
-                    pass
+        if not typed_read:
+            # 시청률은 소수 둘째 자리까지라 float32로 충분 (타입 지정 읽기와 같은 dtype으로 통일)
+            candidate_cols = [col for col in df.columns if col not in exclude_columns and col != date_col]
+            df[candidate_cols] = df[candidate_cols].apply(pd.to_numeric, errors='coerce').astype(np.float32)
         
-        loading_info = {
-            'encoding': encoding_used,
-            'rows': len(df),
-            'columns': len(df.columns),
-            'column_names': list(df.columns),
-            'date_column': date_col,
-            'numeric_columns': numeric_columns,
-            'date_range': (df['date'].min(), df['date'].max())
-        }
+        numeric_columns = [
+            col for col in df.select_dtypes('number').columns
+            if col not in exclude_columns and not df[col].isna().all()
+        ]
         
+        loading_info = build_loading_info(df, encoding_used, date_col, numeric_columns)
+        write_snapshot(df, {'encoding': encoding_used, 'date_column': date_col, 'numeric_columns': numeric_columns})
         return df, numeric_columns, loading_info
         
     except Exception as e:
@@ -262,26 +339,26 @@ def load_data():
 # 요일별 데이터 필터링 함수
 def filter_by_day_type(df, day_type):
     if day_type == "주중":
-        return df[df['weekday'].isin([0, 1, 2, 3, 4])]  # 월~금
+        return df[df['is_weekday']]  # 월~금
     elif day_type == "주말":
-        return df[df['weekday'].isin([5, 6])]  # 토,일
+        return df[df['weekday'].between(5, 6)]  # 토,일
     else:  # "(주중+주말)"
         return df
 
-# 방송사별 색상
+# 방송사별 색상 (앞에서부터 처음 포함되는 이름의 색상 사용)
+CHANNEL_COLOR_RULES = (
+    ('뉴스A', '#2563EB'),  # 파랑
+    ('JTBC', '#9333EA'),  # 보라
+    ('MBN', '#F97316'),  # 주황
+    ('조선', '#DC2626'),  # 빨강 (TV조선 포함)
+)
+DEFAULT_CHANNEL_COLOR = '#10B981'
+
 def get_channel_color(channel_name):
-    if '뉴스A' in channel_name:
-        return '#2563EB'  # 파랑
-    elif 'JTBC' in channel_name:
-        return '#9333EA'  # 보라
-    elif 'MBN' in channel_name:
-        return '#F97316'  # 주황
-    elif 'TV조선' in channel_name or '조선' in channel_name:
-        return '#DC2626'  # 빨강
-    else:
-        return '#10B981'
+    return next((color for keyword, color in CHANNEL_COLOR_RULES if keyword in channel_name), DEFAULT_CHANNEL_COLOR)
 
-# 채널 딕셔너리 생성
+# 채널 딕셔너리 생성 (컬럼 목록과 2049 여부가 같으면 캐시 재사용)
+@st.cache_data(show_spinner=False)
 def create_channels_dict(numeric_columns, show_2049=False):
     channels_dict = {}
     for col in numeric_columns:
@@ -291,13 +368,236 @@ def create_channels_dict(numeric_columns, show_2049=False):
             channels_dict[col] = {'color': get_channel_color(col), 'name': col}
     return channels_dict
 
+# 캐시 키용 DataFrame 요약 (행 수 + 첫/마지막 날짜)
+def df_cache_key(df):
+    if df.empty:
+        return (0,)
+    return (len(df), df['date'].iloc[0].value, df['date'].iloc[-1].value)
+
+# 요일 필터 적용 결과 캐시 (요일 유형이 같으면 재사용, 기간/행 수 요약도 함께 반환)
+@st.cache_data(ttl=CACHE_TTL, max_entries=8, hash_funcs={pd.DataFrame: df_cache_key}, show_spinner=False)
+def compute_filtered(df, day_type):
+    filtered_df = filter_by_day_type(df, day_type)
+    if filtered_df.empty or 'date' not in filtered_df.columns:
+        return filtered_df, None, None, len(filtered_df)
+    return filtered_df, filtered_df['date'].min(), filtered_df['date'].max(), len(filtered_df)
+
+# 이동평균 계산 (데이터가 바뀔 때만 다시 계산)
+@st.cache_data(ttl=CACHE_TTL, max_entries=32, hash_funcs={pd.DataFrame: df_cache_key}, show_spinner=False)
+def compute_moving_averages(df, channels, periods):
+    # 누적합 한 번으로 모든 기간을 계산 (결측값은 건너뛰고 유효 개수로 나눔 = rolling(min_periods=1).mean())
+    # 누적합은 오차 누적을 막기 위해 float64로, 결과는 원본과 같은 float32로 저장
+    ma_channels = [channel for channel in channels if channel in df.columns]
+    values = df[ma_channels].to_numpy(dtype=np.float64)
+    valid = ~np.isnan(values)
+    n_rows = len(values)
+    
+    value_sums = np.zeros((n_rows + 1, len(ma_channels)))
+    np.cumsum(np.where(valid, values, 0.0), axis=0, out=value_sums[1:])
+    valid_counts = np.zeros((n_rows + 1, len(ma_channels)), dtype=np.int64)
+    np.cumsum(valid, axis=0, out=valid_counts[1:])
+    
+    ma_by_period = {}
+    for period in periods:
+        if n_rows >= period:
+            window_start = np.maximum(np.arange(1, n_rows + 1) - period, 0)
+            counts = valid_counts[1:] - valid_counts[window_start]
+            sums = value_sums[1:] - value_sums[window_start]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                ma_by_period[period] = np.where(counts > 0, sums / counts, np.nan).astype(np.float32)
+    
+    ma_columns = {}
+    for i, channel in enumerate(ma_channels):
+        for period in periods:
+            if period in ma_by_period:
+                ma_columns[f"{channel}_MA{period}"] = ma_by_period[period][:, i]
+    return pd.DataFrame(ma_columns, index=df.index)
+
+# 기간 슬라이스 (시작일~종료일, 양 끝 포함, 정렬된 DatetimeIndex 기준)
+@st.cache_data(ttl=CACHE_TTL, max_entries=32, hash_funcs={pd.DataFrame: df_cache_key}, show_spinner=False)
+def slice_by_period(df, start_date, end_date):
+    return df.loc[start_date:end_date]
+
+# 차트 트레이스당 최대 표시 점 개수
+MAX_POINTS_PER_TRACE = 2000
+# 이 행 수를 넘으면 WebGL(Scattergl)로 렌더링 (작은 데이터는 SVG가 초기화 비용이 적음)
+WEBGL_MIN_ROWS = 1000
+
+# LTTB(Largest-Triangle-Three-Buckets) 표본 축소 - 선 모양을 유지하는 점의 인덱스 반환
+# (버킷 루프 없이 한 번에 계산하도록 이전 선택점 대신 이전 버킷 평균점을 기준으로 사용)
+def lttb_indices(x, y, n_out):
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    
+    # 첫 점과 마지막 점은 고정, 나머지를 n_out - 2개 버킷으로 나눔
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    widths = ends - starts
+    
+    # 버킷별 평균점 (누적합 차이로 계산), 앞뒤로 첫 점/마지막 점을 붙여 이전·다음 기준점으로 사용
+    x_sums = np.concatenate(([0.0], np.cumsum(x)))
+    y_sums = np.concatenate(([0.0], np.cumsum(y)))
+    mean_x = np.concatenate(([x[0]], (x_sums[ends] - x_sums[starts]) / widths, [x[-1]]))
+    mean_y = np.concatenate(([y[0]], (y_sums[ends] - y_sums[starts]) / widths, [y[-1]]))
+    prev_x, prev_y = mean_x[:-2, None], mean_y[:-2, None]
+    next_x, next_y = mean_x[2:, None], mean_y[2:, None]
+    
+    # 버킷 × 최대 폭 후보 행렬에서 삼각형 넓이가 가장 큰 점 선택 (버킷 밖 후보는 제외)
+    candidates = starts[:, None] + np.arange(widths.max())
+    in_bucket = candidates < ends[:, None]
+    candidates = np.minimum(candidates, n - 1)
+    area = np.abs(
+        (prev_x - next_x) * (y[candidates] - prev_y)
+        - (prev_x - x[candidates]) * (next_y - prev_y)
+    )
+    area[~in_bucket] = -1.0
+    
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    indices[1:-1] = candidates[np.arange(len(starts)), area.argmax(axis=1)]
+    return indices
+
+# 구간별 최소/최대점 인덱스 (첫 점·마지막 점 포함, 정렬된 고유 인덱스)
+def minmax_indices(y, n_buckets):
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+    
+    # 구간 × 최대 폭 후보 행렬에서 구간별 argmin/argmax (구간 밖 후보는 제외)
+    starts = (np.arange(n_buckets) * n + n_buckets - 1) // n_buckets
+    ends = np.append(starts[1:], n)
+    candidates = starts[:, None] + np.arange((ends - starts).max())
+    in_bucket = candidates < ends[:, None]
+    candidates = np.minimum(candidates, n - 1)
+    values = y[candidates]
+    rows = np.arange(n_buckets)
+    min_idx = candidates[rows, np.where(in_bucket, values, np.inf).argmin(axis=1)]
+    max_idx = candidates[rows, np.where(in_bucket, values, -np.inf).argmax(axis=1)]
+    return np.unique(np.concatenate(([0], min_idx, max_idx, [n - 1])))
+
+# LTTB 전에 최소/최대점으로 미리 추릴 배수 (MinMaxLTTB, 출력 점 개수 × 배수만큼 후보 유지)
+MINMAX_RATIO = 4
+# 이 점 개수를 넘을 때만 MinMax 전처리 (그 이하는 벡터화된 LTTB 한 번이 더 빠름)
+MINMAX_MIN_POINTS = 100000
+
+# 이 배수를 넘을 때만 표본 축소 (조금 넘는 정도는 줄여도 브라우저 이득이 없음)
+DOWNSAMPLE_MIN_RATIO = 2
+
+# 선 트레이스 데이터 표본 축소 (점 개수가 충분히 많을 때만, 결측값 제외 후 MinMax 전처리 + LTTB 적용)
+def downsample_trace(x, y, n_out=MAX_POINTS_PER_TRACE):
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if len(y) <= n_out * DOWNSAMPLE_MIN_RATIO:
+        return x, y
+    
+    valid = ~np.isnan(y)
+    x, y = x[valid], y[valid]
+    if len(y) > max(MINMAX_MIN_POINTS, n_out * MINMAX_RATIO):
+        # 극값을 보존하면서 LTTB 입력을 줄임
+        candidates = minmax_indices(y, n_out * MINMAX_RATIO // 2)
+        x, y = x[candidates], y[candidates]
+    x_num = x.view(np.int64) if np.issubdtype(x.dtype, np.datetime64) else x
+    idx = lttb_indices(x_num.astype(np.float64), y.astype(np.float64), n_out)
+    return x[idx], y[idx]
+
+# 산점도 데이터 표본 축소 (점 개수가 충분히 많을 때만, 결측값 제외 후 구간별 최소/최대점만 남겨 분포 범위 유지)
+def downsample_markers(x, y, n_out=MAX_POINTS_PER_TRACE):
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if len(y) <= n_out * DOWNSAMPLE_MIN_RATIO:
+        return x, y
+    
+    valid = ~np.isnan(y)
+    x, y = x[valid], y[valid]
+    idx = minmax_indices(y, n_out // 2)
+    return x[idx], y[idx]
+
+# 디바이스별 Plotly config 설정 JavaScript (차트 캐시와 분리해 호출부에서 출력)
+DEVICE_CONFIG_SCRIPT = """
+<script>
+// 모바일 디바이스 감지
+function isMobileDevice() {
+    return /Android|webOS|iPhone|iPad|iPod|BlackBerry|IEMobile|Opera Mini/i.test(navigator.userAgent) || window.innerWidth <= 768;
+}
+
+// Plotly config를 디바이스별로 설정
+window.addEventListener('DOMContentLoaded', function() {
+    const plotlyCharts = document.querySelectorAll('.js-plotly-plot');
+    plotlyCharts.forEach(function(chart) {
+        if (isMobileDevice()) {
+            // 모바일: 확대/축소 비활성화, 터치 드래그만
+            if (chart._plotly_config) {
+                chart._plotly_config.scrollZoom = false;
+                chart._plotly_config.doubleClick = false;
+                chart._plotly_config.displayModeBar = false;
+            }
+            // 모바일: X축 간격을 3개월로 변경
+            if (chart.layout && chart.layout.xaxis) {
+                chart.layout.xaxis.dtick = "M3";
+                Plotly.redraw(chart);
+            }
+        } else {
+            // PC: 모든 기능 활성화
+            if (chart._plotly_config) {
+                chart._plotly_config.scrollZoom = true;
+                chart._plotly_config.doubleClick = 'reset';
+                chart._plotly_config.displayModeBar = 'hover';
+            }
+            // PC: X축 간격을 1개월로 설정
+            if (chart.layout && chart.layout.xaxis) {
+                chart.layout.xaxis.dtick = "M1";
+                Plotly.redraw(chart);
+            }
+        }
+    });
+});
+</script>
+"""
+
+# 차트 빌더 캐시 (같은 데이터·옵션이면 Figure 재생성 생략)
+chart_cache = st.cache_data(ttl=CACHE_TTL, max_entries=32, hash_funcs={pd.DataFrame: df_cache_key}, show_spinner=False)
+
+# 이동평균 범례/조작 가이드 (고정 문구)
+MA_LINE_STYLE_MD = (
+    "**선 스타일:**\n\n"
+    "- **실선**: 30일 이동평균\n"
+    "- **대시선**: 90일 이동평균\n"
+    "- **점선**: 180일 이동평균"
+)
+PC_GUIDE_MD = (
+    "**🖥️ PC 조작:**\n\n"
+    "- **마우스 드래그**: 차트 이동\n"
+    "- **스크롤 휠**: 확대/축소\n"
+    "- **더블클릭**: 원래 크기\n"
+    "- **툴바**: 호버시 표시"
+)
+MOBILE_GUIDE_MD = (
+    "**📱 모바일 조작:**\n\n"
+    "- **터치 드래그**: 차트 이동\n"
+    "- **좌우 스와이프**: 시간축 탐색\n"
+    "- **확대/축소**: 비활성화 (단순 탐색)"
+)
+
+# 날짜/시청률 호버 템플릿 앞뒤 (가운데에 방송사 라벨)
+HOVER_PREFIX = '<b>%{x|%y.%m.%d}</b><br><b>'
+HOVER_SUFFIX = '</b><br>시청률: <b>%{y:.2f}%</b><extra></extra>'
+
 # 이동평균 차트
+@chart_cache
 def create_moving_average_chart(df, channels, periods, CHANNELS):
-    for channel in channels:
-        if channel in df.columns:
-            for period in periods:
-                if len(df) >= period:
-                    df[f"{channel}_MA{period}"] = df[channel].rolling(window=period, min_periods=1).mean()
+    ma_df = compute_moving_averages(df, tuple(channels), tuple(periods))
+    
+    # 트레이스 루프 전에 numpy 배열로 한 번만 변환
+    dates = df['date'].to_numpy()
+    ma_values = {col: ma_df[col].to_numpy() for col in ma_df.columns}
+    trace_type = go.Scattergl if len(df) > WEBGL_MIN_ROWS else go.Scatter
+    
+    # 호버 템플릿은 (채널, 기간)별로 미리 만들어 두고 루프에서는 조회만
+    hover_templates = {
+        (channel, period): f'{HOVER_PREFIX}{CHANNELS[channel]["name"]} ({period}일 MA){HOVER_SUFFIX}'
+        for channel in channels if channel in CHANNELS for period in periods
+    }
 
     fig = go.Figure()
     
@@ -305,7 +605,7 @@ def create_moving_average_chart(df, channels, periods, CHANNELS):
         if channel in CHANNELS:
             for period in periods:
                 col_name = f"{channel}_MA{period}"
-                if col_name in df.columns and not df[col_name].isna().all():
+                if col_name in ma_values and not np.isnan(ma_values[col_name]).all():
                     
                     if period == 30:
                         line_style = dict(width=2)
@@ -314,15 +614,14 @@ def create_moving_average_chart(df, channels, periods, CHANNELS):
                     else:
                         line_style = dict(width=3, dash='dot')
                     
-                    fig.add_trace(go.Scatter(
-                        x=df['date'],
-                        y=df[col_name],
+                    x_values, y_values = downsample_trace(dates, ma_values[col_name])
+                    fig.add_trace(trace_type(
+                        x=x_values,
+                        y=y_values,
                         mode='lines',
                         name=f'{CHANNELS[channel]["name"]} {period}일',
                         line=dict(color=CHANNELS[channel]["color"], **line_style),
-                        hovertemplate=f'<b>%{{x|%y.%m.%d}}</b><br>' +
-                                    f'<b>{CHANNELS[channel]["name"]} ({period}일 MA)</b><br>' +
-                                    '시청률: <b>%{y:.2f}%</b><extra></extra>'
+                        hovertemplate=hover_templates[(channel, period)]
                     ))
     
     fig.update_layout(
@@ -351,48 +650,6 @@ def create_moving_average_chart(df, channels, periods, CHANNELS):
         margin=dict(b=80)  # 하단 여백 증가로 X축 텍스트 공간 확보
     )
     
-    # 디바이스별 config 설정을 위한 JavaScript 추가
-    st.markdown("""
-    <script>
-    // 모바일 디바이스 감지
-    function isMobileDevice() {
-        return /Android|webOS|iPhone|iPad|iPod|BlackBerry|IEMobile|Opera Mini/i.test(navigator.userAgent) || window.innerWidth <= 768;
-    }
-    
-    // Plotly config를 디바이스별로 설정
-    window.addEventListener('DOMContentLoaded', function() {
-        const plotlyCharts = document.querySelectorAll('.js-plotly-plot');
-        plotlyCharts.forEach(function(chart) {
-            if (isMobileDevice()) {
-                // 모바일: 확대/축소 비활성화, 터치 드래그만
-                if (chart._plotly_config) {
-                    chart._plotly_config.scrollZoom = false;
-                    chart._plotly_config.doubleClick = false;
-                    chart._plotly_config.displayModeBar = false;
-                }
-                // 모바일: X축 간격을 3개월로 변경
-                if (chart.layout && chart.layout.xaxis) {
-                    chart.layout.xaxis.dtick = "M3";
-                    Plotly.redraw(chart);
-                }
-            } else {
-                // PC: 모든 기능 활성화
-                if (chart._plotly_config) {
-                    chart._plotly_config.scrollZoom = true;
-                    chart._plotly_config.doubleClick = 'reset';
-                    chart._plotly_config.displayModeBar = 'hover';
-                }
-                // PC: X축 간격을 1개월로 설정
-                if (chart.layout && chart.layout.xaxis) {
-                    chart.layout.xaxis.dtick = "M1";
-                    Plotly.redraw(chart);
-                }
-            }
-        });
-    });
-    </script>
-    """, unsafe_allow_html=True)
-    
     # 기본 config (PC 기준으로 설정, JS에서 모바일 시 변경됨)
     config = {
         'scrollZoom': True,  # PC: 스크롤 줌 활성화
@@ -412,9 +669,8 @@ def create_moving_average_chart(df, channels, periods, CHANNELS):
     return fig, config
 
 # 동기간 비교 차트 (기간 평균 방식)
-def create_period_comparison_chart(df, channels, CHANNELS, comparison_type="최근 6개월", custom_dates=None):
-    latest_date = df['date'].max()
-    
+@chart_cache
+def create_period_comparison_chart(df, channels, CHANNELS, latest_date, comparison_type="최근 6개월", custom_dates=None):
     if custom_dates:
         start_date, end_date = custom_dates
         # 전년 동기간
@@ -426,16 +682,7 @@ def create_period_comparison_chart(df, channels, CHANNELS, comparison_type="최
         title = f"선택기간 vs 전년 동기간 시청률 비교"
     else:
         # 개월 수 추출
-        if "1개월" in comparison_type:
-            months_count = 1
-        elif "3개월" in comparison_type:
-            months_count = 3
-        elif "6개월" in comparison_type:
-            months_count = 6
-        elif "9개월" in comparison_type:
-            months_count = 9
-        else:  # "12개월"
-            months_count = 12
+        months_count = PERIOD_MONTHS.get(comparison_type, 12)
         
         # 최근 N개월 기간 평균
         end_date = latest_date
@@ -451,61 +698,55 @@ def create_period_comparison_chart(df, channels, CHANNELS, comparison_type="최
         title = f"{comparison_type} 평균 vs 전년 동기 평균 시청률 비교"
     
     # 현재 기간 데이터
-    current_data = df[
-        (df['date'] >= start_date) & (df['date'] <= end_date)
-    ][channels].mean()
+    current_data = slice_by_period(df, start_date, end_date)[list(channels)].mean()
     
     # 전년 동기 데이터
-    previous_data = df[
-        (df['date'] >= prev_start_date) & (df['date'] <= prev_end_date)
-    ][channels].mean()
+    previous_data = slice_by_period(df, prev_start_date, prev_end_date)[list(channels)].mean()
+    
+    # 방송사별 값을 배열로 모아 전년/현재 2개 trace로 그림
+    bar_channels = [channel for channel in channels if channel in CHANNELS]
+    names = [CHANNELS[channel]["name"] for channel in bar_channels]
+    colors = [CHANNELS[channel]["color"] for channel in bar_channels]
+    prev_vals = [previous_data.get(channel, 0) for channel in bar_channels]
+    curr_vals = [current_data.get(channel, 0) for channel in bar_channels]
     
-    x_labels = [prev_period_label, period_label]
+    # 증감 계산 (%p)
+    curr_texts = []
+    for prev_val, curr_val in zip(prev_vals, curr_vals):
+        diff = curr_val - prev_val
+        diff_text = f"({diff:+.2f}%p)" if abs(diff) >= 0.01 else "(±0.00%p)"
+        curr_texts.append(f'<b>{curr_val:.2f}%</b> <span style="color:{"red" if diff < 0 else "green"}; font-size:14px;">{diff_text}</span>')
     
     fig = go.Figure()
     
-    # 각 방송사별 막대
-    for i, channel in enumerate(channels):
-        if channel in CHANNELS:
-            prev_val = previous_data.get(channel, 0)
-            curr_val = current_data.get(channel, 0)
-            
-            # 증감 계산 (%p)
-            diff = curr_val - prev_val
-            diff_text = f"({diff:+.2f}%p)" if abs(diff) >= 0.01 else "(±0.00%p)"
-            
-            # 전년 막대
-            fig.add_trace(go.Bar(
-                name=f'{CHANNELS[channel]["name"]} (전년)',
-                x=[x_labels[0]],
-                y=[prev_val],
-                marker_color=CHANNELS[channel]["color"],
-                opacity=0.6,
-                legendgroup=channel,
-                offsetgroup=i,
-                text=f'<b>{prev_val:.2f}%</b>',
-                textposition='outside',
-                textfont=dict(size=16)  # 시청률 수치 폰트 크기 증가
-            ))
-            
-            # 현재 막대 (증감 표시를 위에 배치)
-            fig.add_trace(go.Bar(
-                name=f'{CHANNELS[channel]["name"]} (현재)',
-                x=[x_labels[1]],
-                y=[curr_val],
-                marker_color=CHANNELS[channel]["color"],
-                opacity=1.0,
-                legendgroup=channel,
-                offsetgroup=i,
-                text=f'<b>{curr_val:.2f}%</b> <span style="color:{"red" if diff < 0 else "green"}; font-size:14px;">{diff_text}</span>',
-                textposition='outside',
-                textfont=dict(size=16)  # 시청률 수치 폰트 크기 증가
-            ))
+    # 전년 막대
+    fig.add_trace(go.Bar(
+        name=f'전년 ({prev_period_label})',
+        x=names,
+        y=prev_vals,
+        marker_color=colors,
+        opacity=0.6,
+        text=[f'<b>{v:.2f}%</b>' for v in prev_vals],
+        textposition='outside',
+        textfont=dict(size=16)  # 시청률 수치 폰트 크기 증가
+    ))
+    
+    # 현재 막대 (증감 표시를 위에 배치)
+    fig.add_trace(go.Bar(
+        name=f'현재 ({period_label})',
+        x=names,
+        y=curr_vals,
+        marker_color=colors,
+        opacity=1.0,
+        text=curr_texts,
+        textposition='outside',
+        textfont=dict(size=16)  # 시청률 수치 폰트 크기 증가
+    ))
     
     fig.update_layout(
         height=550,  # 차트 높이 증가로 여유 공간 확보
         title=title,
-        xaxis_title="기간",
+        xaxis_title=f"방송사 ({prev_period_label} vs {period_label})",
         yaxis_title="시청률 (%)",
         barmode='group',
         legend=dict(
@@ -531,15 +772,22 @@ def create_period_comparison_chart(df, channels, CHANNELS, comparison_type="최
     return fig
 
 # 산점도 차트
+@chart_cache
 def create_scatter_chart(df, channels, CHANNELS):
+    # 트레이스 루프 전에 numpy 배열로 한 번만 변환
+    dates = df['date'].to_numpy()
+    values = {channel: df[channel].to_numpy() for channel in channels if channel in CHANNELS and channel in df.columns}
+    trace_type = go.Scattergl if len(df) > WEBGL_MIN_ROWS else go.Scatter
+    
     fig = go.Figure()
     
     for channel in channels:
-        if channel in CHANNELS and channel in df.columns:
-            # 산점도만 표시
-            fig.add_trace(go.Scatter(
-                x=df['date'],
-                y=df[channel],
+        if channel in values:
+            # 산점도만 표시 (점이 아주 많을 때만 최소/최대점으로 축소, 행 수가 많으면 WebGL 렌더링)
+            x_values, y_values = downsample_markers(dates, values[channel])
+            fig.add_trace(trace_type(
+                x=x_values,
+                y=y_values,
                 mode='markers',
                 name=f'{CHANNELS[channel]["name"]}',
                 marker=dict(
@@ -547,9 +795,7 @@ def create_scatter_chart(df, channels, CHANNELS):
                     size=6,
                     opacity=0.7
                 ),
-                hovertemplate=f'<b>%{{x|%y.%m.%d}}</b><br>' +
-                            f'<b>{CHANNELS[channel]["name"]}</b><br>' +
-                            '시청률: <b>%{y:.2f}%</b><extra></extra>'
+                hovertemplate=f'{HOVER_PREFIX}{CHANNELS[channel]["name"]}{HOVER_SUFFIX}'
             ))
     
     fig.update_layout(
@@ -598,67 +844,41 @@ def create_scatter_chart(df, channels, CHANNELS):
     return fig, config
 
 # 요일별 시청률 막대그래프
-def create_weekday_chart(df, channels, CHANNELS, period_type="전체", day_filter="(주중+주말)"):
+@chart_cache
+def create_weekday_chart(df, channels, CHANNELS, latest_date, period_starts, period_type="전체", day_filter="(주중+주말)"):
     # 기간별 데이터 필터링
-    latest_date = df['date'].max()
-    
-    if period_type == "최근 1개월":
-        start_date = latest_date - pd.DateOffset(months=1)
-        filtered_df = df[df['date'] >= start_date]
-    elif period_type == "최근 3개월":
-        start_date = latest_date - pd.DateOffset(months=3)
-        filtered_df = df[df['date'] >= start_date]
-    elif period_type == "최근 6개월":
-        start_date = latest_date - pd.DateOffset(months=6)
-        filtered_df = df[df['date'] >= start_date]
-    elif period_type == "최근 9개월":
-        start_date = latest_date - pd.DateOffset(months=9)
-        filtered_df = df[df['date'] >= start_date]
-    elif period_type == "최근 12개월":
-        start_date = latest_date - pd.DateOffset(months=12)
-        filtered_df = df[df['date'] >= start_date]
+    start_date = period_starts.get(period_type)
+    if start_date is not None:
+        filtered_df = slice_by_period(df, start_date, latest_date)
     else:  # "전체"
         filtered_df = df
     
-    # 요일별 시청률 계산
-    df_weekday = filtered_df.copy()
-    df_weekday['weekday_name'] = df_weekday['date'].dt.day_name()
-    
     # 요일 필터에 따른 요일 순서 설정
-    if day_filter == "주중":
-        weekday_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
-        weekday_korean = ['월요일', '화요일', '수요일', '목요일', '금요일']
-    elif day_filter == "주말":
-        weekday_order = ['Saturday', 'Sunday']
-        weekday_korean = ['토요일', '일요일']
-    else:  # "(주중+주말)"
-        weekday_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        weekday_korean = ['월요일', '화요일', '수요일', '목요일', '금요일', '토요일', '일요일']
+    weekday_korean = [WEEKDAY_KOREAN[i] for i in DAY_FILTER_WEEKDAYS.get(day_filter, range(7))]
     
     fig = go.Figure()
     
+    # 요일별 시청률 계산 (전체 방송사를 한 번의 groupby로, 데이터 없는 요일은 0)
+    bar_channels = [channel for channel in channels if channel in CHANNELS and channel in filtered_df.columns]
+    weekday_avg = (
+        filtered_df.groupby('weekday_name', observed=True)[bar_channels]
+        .mean()
+        .reindex(weekday_korean, fill_value=0)
+    )
+    
     # 각 방송사별 막대 추가
-    for channel in channels:
-        if channel in CHANNELS and channel in df_weekday.columns:
-            weekday_avg = df_weekday.groupby('weekday_name')[channel].mean()
-            
-            # 요일 순서로 정렬
-            y_values = []
-            for day in weekday_order:
-                if day in weekday_avg.index:
-                    y_values.append(weekday_avg[day])
-                else:
-                    y_values.append(0)
-            
-            fig.add_trace(go.Bar(
-                x=weekday_korean,
-                y=y_values,
-                name=CHANNELS[channel]['name'],
-                marker_color=CHANNELS[channel]['color'],
-                text=[f'<b>{val:.2f}%</b>' for val in y_values],
-                textposition='outside',
-                textfont=dict(size=14)  # 막대 위 텍스트 폰트 크기 증가
-            ))
+    for channel in bar_channels:
+        y_values = weekday_avg[channel].tolist()
+        
+        fig.add_trace(go.Bar(
+            x=weekday_korean,
+            y=y_values,
+            name=CHANNELS[channel]['name'],
+            marker_color=CHANNELS[channel]['color'],
+            text=[f'<b>{val:.2f}%</b>' for val in y_values],
+            textposition='outside',
+            textfont=dict(size=14)  # 막대 위 텍스트 폰트 크기 증가
+        ))
     
     fig.update_layout(
         height=500,
@@ -682,12 +902,57 @@ def create_weekday_chart(df, channels, CHANNELS, period_type="전체", day_filte
     
     return fig
 
+# 요일별 변동성 구간 (최고-최저 차이 / 평균, %)
+VARIATION_THRESHOLDS = [10, 20]
+VARIATION_LABELS = ["낮음", "보통", "높음"]
+
+# 요일별 패턴 분석용 평균 (요일 이름 목록 + 같은 순서의 평균 배열) + 분석 시작일
+@chart_cache
+def compute_weekday_avg(df, channels, latest_date, period_starts, period_type="전체", day_filter="(주중+주말)"):
+    start_date = period_starts.get(period_type)
+    if start_date is not None:
+        analysis_df = slice_by_period(df, start_date, latest_date)
+    else:  # "전체"
+        analysis_df = df
+    
+    # 선택된 요일 필터에 따른 요일 번호 (0=월요일, 6=일요일)
+    weekday_indices = DAY_FILTER_WEEKDAYS.get(day_filter, range(7))
+    weekday_korean = [WEEKDAY_KOREAN[i] for i in weekday_indices]
+    
+    # 요일별 평균을 한 번의 groupby로 계산한 뒤 선택된 채널들의 평균 (weekday_korean과 같은 순서의 배열, 데이터 없으면 NaN)
+    weekday_means = analysis_df.groupby('weekday')[list(channels)].mean().mean(axis=1)
+    day_avgs = weekday_means.reindex(list(weekday_indices)).to_numpy(dtype=np.float64)
+    
+    return weekday_korean, day_avgs, start_date
+
+# 상관관계 강도 구간 (0.3 미만 / 0.3~0.5 / 0.5~0.7 / 0.7 이상)
+CORRELATION_THRESHOLDS = [0.3, 0.5, 0.7]
+CORRELATION_EMOJI = np.array(["🔴", "🟠", "🟡", "🟢"])  # 약함, 보통, 강함, 매우 강함
+
+# 상관관계 범례/해석 가이드 (고정 문구)
+CORRELATION_LEGEND_MD = (
+    "**📊 상관관계 강도 기준**\n\n"
+    "🟢 0.7 이상: 매우 강한 연관성\n\n"
+    "🟡 0.5~0.7: 강한 연관성\n\n"
+    "🟠 0.3~0.5: 보통 연관성\n\n"
+    "🔴 0.3 미만: 약한 연관성"
+)
+CORRELATION_GUIDE_MD = (
+    "**💡 해석 가이드**\n\n"
+    "- 양수: 같은 방향으로 변화\n"
+    "- 음수: 반대 방향으로 변화\n"
+    "- 절댓값이 클수록 연관성 강함"
+)
+
 # 스테이션별 상관관계
+@chart_cache
 def create_correlation_analysis(df, channels, analysis_period=None, custom_analysis_dates=None):
+    channels = list(channels)
+    
     # 분석 기간에 따른 데이터 필터링
     if custom_analysis_dates:
         start_date, end_date = custom_analysis_dates
-        recent_data = df[(df['date'] >= start_date) & (df['date'] <= end_date)]
+        recent_data = slice_by_period(df, start_date, end_date)
         period_text = f"{start_date.strftime('%y.%m.%d')}~{end_date.strftime('%y.%m.%d')}"
     elif analysis_period != "전체":
         recent_data = df.tail(analysis_period)
@@ -696,57 +961,54 @@ def create_correlation_analysis(df, channels, analysis_period=None, custom_analy
         recent_data = df
         period_text = "전체 기간"
     
-    # 상관관계 계산
-    corr_matrix = recent_data[channels].corr()
+    # 상관관계 계산 (결측값이 없으면 표준화 후 행렬곱 한 번으로, 있으면 pandas 쌍별 계산)
+    values = recent_data[channels].to_numpy(dtype=np.float32, copy=False)
+    if len(values) > 1 and not np.isnan(values).any():
+        with np.errstate(invalid='ignore', divide='ignore'):
+            standardized = (values - values.mean(axis=0)) / values.std(axis=0)
+            corr = np.clip(standardized.T @ standardized / len(values), -1.0, 1.0)
+        corr_matrix = pd.DataFrame(corr.astype(np.float64), index=channels, columns=channels)
+    else:
+        corr_matrix = recent_data[channels].corr()
     
-    # 히트맵
-    fig = px.imshow(
-        corr_matrix,
+    # 히트맵 (상관계수 텍스트는 트레이스 단위로 한 번에 표시)
+    fig = go.Figure(go.Heatmap(
+        z=corr_matrix.to_numpy(),
         x=channels,
         y=channels,
-        color_continuous_scale='RdBu',
-        aspect='auto',
-        title=f"스테이션별 시청률 상관관계 ({period_text})"
-    )
-    
-    # 상관계수 텍스트 추가
-    for i in range(len(channels)):
-        for j in range(len(channels)):
-            fig.add_annotation(
-                x=j, y=i,
-                text=f"<b>{corr_matrix.iloc[i, j]:.2f}</b>",
-                showarrow=False,
-                font=dict(
-                    color="white" if abs(corr_matrix.iloc[i, j]) > 0.5 else "black",
-                    size=14
-                )
-            )
+        colorscale='RdBu',
+        zmid=0,
+        texttemplate='%{z:.2f}',
+        textfont=dict(size=14)
+    ))
     
     fig.update_layout(
         height=400,
+        title=f"스테이션별 시청률 상관관계 ({period_text})",
         xaxis=dict(
             tickfont=dict(size=12),  # X축 폰트 크기 증가
             tickangle=0  # 방송사명 수평 표시
         ),
         yaxis=dict(
             tickfont=dict(size=12),  # Y축 폰트 크기 증가
-            tickangle=0  # 방송사명 수평 표시
+            tickangle=0,  # 방송사명 수평 표시
+            autorange='reversed'  # 첫 방송사를 위쪽에 표시
         ),
         font=dict(size=12),  # 전체 폰트 크기 증가
         margin=dict(b=80, l=100)  # 하단, 좌측 여백 증가
     )
     
-    # 모든 상관관계 수치를 담은 데이터프레임 생성
-    corr_pairs = []
-    for i in range(len(channels)):
-        for j in range(i+1, len(channels)):
-            corr_pairs.append({
-                '방송사 1': channels[i],
-                '방송사 2': channels[j],
-                '상관계수': round(corr_matrix.iloc[i, j], 3)
-            })
+    # 모든 상관관계 수치를 담은 데이터프레임 생성 (상삼각 인덱스로 한 번에)
+    rows, cols = np.triu_indices(len(channels), k=1)
+    pair_values = corr_matrix.to_numpy()[rows, cols].round(3)
+    order = np.argsort(-np.abs(pair_values), kind='stable')
+    channel_names = np.asarray(channels)
     
-    corr_df = pd.DataFrame(corr_pairs).sort_values('상관계수', key=abs, ascending=False)
+    corr_df = pd.DataFrame({
+        '방송사 1': channel_names[rows[order]],
+        '방송사 2': channel_names[cols[order]],
+        '상관계수': pair_values[order]
+    })
     
     return fig, corr_df
 
@@ -756,6 +1018,7 @@ with st.sidebar:
     
     if st.button("🔄 데이터 새로고침", type="primary"):
         st.cache_data.clear()
+        clear_snapshot()
         st.rerun()
 
 # 데이터 로드
@@ -786,7 +1049,7 @@ with st.sidebar:
     )
     
     # 선택한 요일에 따라 데이터 필터링
-    filtered_df = filter_by_day_type(df, day_type)
+    filtered_df, date_min, date_max, n_rows = compute_filtered(df, day_type)
     
     st.markdown("<br>", unsafe_allow_html=True)
     
@@ -800,7 +1063,8 @@ with st.sidebar:
     )
     
     show_2049 = rating_type == "2049 시청률"
-    CHANNELS = create_channels_dict(numeric_columns, show_2049)
+    CHANNELS = create_channels_dict(tuple(numeric_columns), show_2049)
+    CHANNEL_KEYS = tuple(CHANNELS)  # 방송사 목록 (기본값/선택지에서 재사용)
     
     st.markdown("<br>", unsafe_allow_html=True)
     
@@ -820,12 +1084,12 @@ with st.sidebar:
         
         # 뉴스A가 있으면 기본 선택, 없으면 첫 번째 채널
         default_channel = None
-        for channel in CHANNELS.keys():
+        for channel in CHANNEL_KEYS:
             if '뉴스A' in channel:
                 default_channel = channel
                 break
         if not default_channel and CHANNELS:
-            default_channel = list(CHANNELS.keys())[0]
+            default_channel = CHANNEL_KEYS[0]
         
         # 기본값을 30, 90, 180으로 설정
         periods = st.multiselect(
@@ -962,11 +1226,11 @@ with st.sidebar:
     if chart_type == "이동평균선" and default_channel:
         default_channels = [default_channel]
     else:
-        default_channels = list(CHANNELS.keys())
+        default_channels = CHANNEL_KEYS
     
     channels = st.multiselect(
         "방송사를 선택하세요:",
-        list(CHANNELS.keys()),
+        CHANNEL_KEYS,
         default=default_channels,
         help="여러 개 선택 가능"
     )
@@ -974,18 +1238,23 @@ with st.sidebar:
     # 데이터 정보
     st.markdown("---")
     st.subheader("📋 데이터 정보")
-    st.write(f"**총 데이터**: {len(filtered_df)}행 (필터링 후)")
-    if not filtered_df.empty and 'date' in filtered_df.columns:
-        st.write(f"**기간**: {filtered_df['date'].min().strftime('%Y-%m-%d')} ~ {filtered_df['date'].max().strftime('%Y-%m-%d')}")
+    st.write(f"**총 데이터**: {n_rows}행 (필터링 후)")
+    if date_min is not None:
+        st.write(f"**기간**: {format_date(date_min, '%Y-%m-%d')} ~ {format_date(date_max, '%Y-%m-%d')}")
     st.write(f"**현재 표시**: {rating_type}")
     st.write(f"**요일 필터**: {day_type}")
     st.write(f"**차트 유형**: {chart_type}")
 
 # 메인 차트
+# 같은 차트/요일 조합에서는 확대·이동 상태를 유지 (Plotly.react 경로로 갱신)
+uirevision = f"{chart_type}_{day_type}"
+
 if channels and not filtered_df.empty:
     if chart_type == "이동평균선" and periods:
         st.subheader(f"📈 {rating_type} 이동평균선 ({day_type})")
-        fig, config = create_moving_average_chart(filtered_df, channels, periods, CHANNELS)
+        st.markdown(DEVICE_CONFIG_SCRIPT, unsafe_allow_html=True)
+        fig, config = create_moving_average_chart(filtered_df, tuple(channels), tuple(periods), CHANNELS)
+        fig.update_layout(uirevision=uirevision)
         st.plotly_chart(fig, use_container_width=True, config=config)
         
         # 현재 수치 표시 (이동평균선일 때만)
@@ -995,63 +1264,55 @@ if channels and not filtered_df.empty:
             st.subheader("📊 선택기간 평균 시청률")
             
             if not filtered_df.empty:
-                latest_date = filtered_df['date'].max()
-                st.info(f"**기준일**: {latest_date.strftime('%Y년 %m월 %d일')}")
-                
+                latest_date = date_max
+                st.info(f"**기준일**: {format_date(latest_date, '%Y년 %m월 %d일')}")
+
+                ma_df = compute_moving_averages(filtered_df, tuple(channels), tuple(periods))
+                # 마지막 행을 한 번만 꺼내 채널/기간별로 조회
+                last_row = ma_df.iloc[-1]
                 cols = st.columns(min(len(channels), 4))
                 for i, channel in enumerate(channels[:4]):
                     with cols[i]:
                         st.markdown(f"**{CHANNELS[channel]['name']}**")
                         for period in periods:
-                            col_name = f"{channel}_MA{period}"
-                            if col_name in filtered_df.columns and not filtered_df[col_name].empty:
-                                latest = filtered_df[col_name].iloc[-1]
-                                if not pd.isna(latest):
-                                    st.metric(f"{period}일", f"{latest:.2f}%")
-        
+                            latest = last_row.get(f"{channel}_MA{period}", np.nan)
+                            if not pd.isna(latest):
+                                st.metric(f"{period}일", f"{latest:.2f}%")
+
         with col2:
             st.subheader("🎨 범례")
             
             st.markdown("**방송사별 색상:**")
-            for channel, info in CHANNELS.items():
-                if channel in channels:
-                    st.markdown(
-                        f'<span style="color: {info["color"]}; font-weight: bold;">● {info["name"]}</span>',
-                        unsafe_allow_html=True
-                    )
-            
-            st.markdown("**선 스타일:**")
-            st.markdown("- **실선**: 30일 이동평균")
-            st.markdown("- **대시선**: 90일 이동평균")
-            st.markdown("- **점선**: 180일 이동평균")
-            
+            legend_html = "<br>".join(
+                f'<span style="color: {info["color"]}; font-weight: bold;">● {info["name"]}</span>'
+                for channel, info in CHANNELS.items() if channel in channels
+            )
+            st.markdown(legend_html, unsafe_allow_html=True)
+
+            st.markdown(MA_LINE_STYLE_MD)
+
             # 디바이스별 조작 가이드
-            st.markdown("**🖥️ PC 조작:**")
-            st.markdown("- **마우스 드래그**: 차트 이동")
-            st.markdown("- **스크롤 휠**: 확대/축소")
-            st.markdown("- **더블클릭**: 원래 크기")
-            st.markdown("- **툴바**: 호버시 표시")
-            st.markdown("**📱 모바일 조작:**")
-            st.markdown("- **터치 드래그**: 차트 이동")
-            st.markdown("- **좌우 스와이프**: 시간축 탐색")
-            st.markdown("- **확대/축소**: 비활성화 (단순 탐색)")
-        
+            st.markdown(PC_GUIDE_MD)
+            st.markdown(MOBILE_GUIDE_MD)
+
     elif chart_type == "동기간 비교":
         st.subheader(f"📊 {rating_type} 동기간 비교 ({day_type})")
         if use_custom_dates and custom_dates:
-            fig = create_period_comparison_chart(filtered_df, channels, CHANNELS, custom_dates=custom_dates)
+            fig = create_period_comparison_chart(filtered_df, tuple(channels), CHANNELS, date_max, custom_dates=custom_dates)
         elif comparison_type:
-            fig = create_period_comparison_chart(filtered_df, channels, CHANNELS, comparison_type)
+            fig = create_period_comparison_chart(filtered_df, tuple(channels), CHANNELS, date_max, comparison_type)
         else:
             st.warning("비교 기간을 선택해주세요.")
             fig = None
             
         if fig:
+            fig.update_layout(uirevision=uirevision)
             st.plotly_chart(fig, use_container_width=True)
         
     elif chart_type == "시청률 분포 산점도":
         st.subheader(f"🔸 {rating_type} 시청률 분포 산점도 ({day_type})")
-        fig, config = create_scatter_chart(filtered_df, channels, CHANNELS)
+        fig, config = create_scatter_chart(filtered_df, tuple(channels), CHANNELS)
+        fig.update_layout(uirevision=uirevision)
         st.plotly_chart(fig, use_container_width=True, config=config)
         
         # 디바이스별 조작 가이드
@@ -1073,105 +1334,76 @@ if channels and not filtered_df.empty:
         st.subheader(f"📊 {rating_type} 요일별 시청률 비교")
         if channels:
             # 원본 데이터를 사용하되, 현재 선택된 요일 필터를 차트에 반영
-            fig = create_weekday_chart(df, channels, CHANNELS, period_type, day_type)
+            fig = create_weekday_chart(
+                df, tuple(channels), CHANNELS, loading_info['latest_date'], loading_info['period_starts'],
+                period_type, day_type
+            )
+            fig.update_layout(uirevision=uirevision)
             st.plotly_chart(fig, use_container_width=True)
             
             # 요일별 패턴 분석
             st.markdown("### 📋 요일별 패턴 분석")
-            
-            # 기간별 데이터 필터링 (위의 함수와 동일한 로직)
-            latest_date = df['date'].max()
-            
-            if period_type == "최근 1개월":
-                start_date = latest_date - pd.DateOffset(months=1)
-                analysis_df = df[df['date'] >= start_date]
-            elif period_type == "최근 3개월":
-                start_date = latest_date - pd.DateOffset(months=3)
-                analysis_df = df[df['date'] >= start_date]
-            elif period_type == "최근 6개월":
-                start_date = latest_date - pd.DateOffset(months=6)
-                analysis_df = df[df['date'] >= start_date]
-            elif period_type == "최근 9개월":
-                start_date = latest_date - pd.DateOffset(months=9)
-                analysis_df = df[df['date'] >= start_date]
-            elif period_type == "최근 12개월":
-                start_date = latest_date - pd.DateOffset(months=12)
-                analysis_df = df[df['date'] >= start_date]
-            else:  # "전체"
-                analysis_df = df
-            
-            # 요일별 평균 계산
-            analysis_df = analysis_df.copy()
-            analysis_df['weekday_name'] = analysis_df['date'].dt.day_name()
-            
-            # 선택된 요일 필터에 따른 요일 순서 설정
-            if day_type == "주중":
-                weekday_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
-                weekday_korean = ['월요일', '화요일', '수요일', '목요일', '금요일']
-            elif day_type == "주말":
-                weekday_order = ['Saturday', 'Sunday']
-                weekday_korean = ['토요일', '일요일']
-            else:  # "(주중+주말)"
-                weekday_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-                weekday_korean = ['월요일', '화요일', '수요일', '목요일', '금요일', '토요일', '일요일']
-            
+
+            # 요일별 평균 (기간/요일 필터/방송사가 같으면 캐시 재사용)
+            latest_date = loading_info['latest_date']
+            weekday_korean, day_avgs, start_date = compute_weekday_avg(
+                df, tuple(channels), latest_date, loading_info['period_starts'],
+                period_type, day_type
+            )
+
+            # 데이터가 있는 요일과 최고/최저 위치 (배열 하나로 계산)
+            has_data = ~np.isnan(day_avgs)
+            data_days = int(has_data.sum())
+            if data_days:
+                max_idx = int(np.nanargmax(day_avgs))
+                min_idx = int(np.nanargmin(day_avgs))
+
             col1, col2 = st.columns(2)
             
             with col1:
                 st.markdown(f"**📊 {period_type} 요일별 평균 시청률 ({day_type})**")
-                
-                # 전체 방송사 평균 계산
-                all_channels_avg = {}
-                for day_eng, day_kor in zip(weekday_order, weekday_korean):
-                    day_data = analysis_df[analysis_df['weekday_name'] == day_eng]
-                    if len(day_data) > 0:
-                        # 선택된 채널들의 평균
-                        day_avg = day_data[channels].mean().mean()
-                        all_channels_avg[day_kor] = day_avg
-                
-                if all_channels_avg:
-                    max_day = max(all_channels_avg, key=all_channels_avg.get)
-                    min_day = min(all_channels_avg, key=all_channels_avg.get)
-                    
-                    for day_kor in weekday_korean:
-                        if day_kor in all_channels_avg:
-                            avg_val = all_channels_avg[day_kor]
-                            if day_kor == max_day:
-                                st.success(f"{day_kor}: {avg_val:.2f}% 🏆 (최고)")
-                            elif day_kor == min_day:
-                                st.error(f"{day_kor}: {avg_val:.2f}% 📉 (최저)")
-                            else:
-                                st.info(f"{day_kor}: {avg_val:.2f}%")
-                        else:
-                            st.write(f"{day_kor}: 데이터 없음")
-            
+
+                if data_days:
+                    # 요일별 평균을 표 하나로 출력 (최고/최저는 비고 열에 표시)
+                    notes = np.full(len(weekday_korean), "", dtype=object)
+                    notes[max_idx] = "🏆 최고"
+                    if min_idx != max_idx:
+                        notes[min_idx] = "📉 최저"
+                    weekday_table = pd.DataFrame({
+                        "요일": weekday_korean,
+                        "평균 시청률(%)": np.where(
+                            has_data, np.char.mod("%.2f", np.nan_to_num(day_avgs)), "데이터 없음"
+                        ),
+                        "비고": notes
+                    }).set_index("요일")
+                    st.table(weekday_table)
+
             with col2:
-                st.markdown("**💡 패턴 해석**")
-                
-                if all_channels_avg and len(all_channels_avg) > 1:
-                    st.markdown(f"- **최고 시청률**: {max_day}")
-                    st.markdown(f"- **최저 시청률**: {min_day}")
-                    
+                # 해석 항목을 모아 한 번에 출력
+                pattern_lines = []
+                if data_days > 1:
+                    pattern_lines.append(f"- **최고 시청률**: {weekday_korean[max_idx]}")
+                    pattern_lines.append(f"- **최저 시청률**: {weekday_korean[min_idx]}")
+
                     # 변동성 계산
-                    avg_values = list(all_channels_avg.values())
-                    variation = ((max(avg_values) - min(avg_values)) / np.mean(avg_values)) * 100
-                    
-                    if variation > 20:
-                        st.markdown(f"- **변동성**: 높음 ({variation:.1f}%)")
-                    elif variation > 10:
-                        st.markdown(f"- **변동성**: 보통 ({variation:.1f}%)")
-                    else:
-                        st.markdown(f"- **변동성**: 낮음 ({variation:.1f}%)")
-                        
-                elif len(all_channels_avg) == 1:
-                    st.markdown("- **단일 요일**: 비교 대상이 없어 변동성 계산 불가")
+                    avg_values = day_avgs[has_data]
+                    variation = (np.ptp(avg_values) / avg_values.mean()) * 100
+
+                    # 10% 이하 낮음, 20% 이하 보통, 그 이상 높음 (계산 불가 값은 낮음)
+                    variation_level = 0 if np.isnan(variation) else int(np.searchsorted(VARIATION_THRESHOLDS, variation))
+                    pattern_lines.append(f"- **변동성**: {VARIATION_LABELS[variation_level]} ({variation:.1f}%)")
+
+                elif data_days == 1:
+                    pattern_lines.append("- **단일 요일**: 비교 대상이 없어 변동성 계산 불가")
                 else:
-                    st.markdown("- **데이터 부족**: 분석할 데이터가 없습니다")
-                
-                st.markdown(f"- **분석 대상**: {day_type}")
-                st.markdown(f"- **분석 기간**: {period_type}")
+                    pattern_lines.append("- **데이터 부족**: 분석할 데이터가 없습니다")
+
+                pattern_lines.append(f"- **분석 대상**: {day_type}")
+                pattern_lines.append(f"- **분석 기간**: {period_type}")
                 if period_type != "전체":
-                    st.markdown(f"- **데이터 기간**: {start_date.strftime('%Y.%m.%d')} ~ {latest_date.strftime('%Y.%m.%d')}")
+                    pattern_lines.append(f"- **데이터 기간**: {format_date(start_date, '%Y.%m.%d')} ~ {format_date(latest_date, '%Y.%m.%d')}")
+
+                st.markdown("**💡 패턴 해석**\n\n" + "\n".join(pattern_lines))
         else:
             st.warning("방송사를 선택해주세요.")
         
@@ -1179,14 +1411,15 @@ if channels and not filtered_df.empty:
         st.subheader(f"🌈 {rating_type} 스테이션별 상관관계 ({day_type})")
         if len(channels) >= 2:
             if use_custom_analysis_dates and custom_analysis_dates:
-                fig, corr_df = create_correlation_analysis(filtered_df, channels, custom_analysis_dates=custom_analysis_dates)
+                fig, corr_df = create_correlation_analysis(filtered_df, tuple(channels), custom_analysis_dates=custom_analysis_dates)
             elif analysis_period:
-                fig, corr_df = create_correlation_analysis(filtered_df, channels, analysis_period)
+                fig, corr_df = create_correlation_analysis(filtered_df, tuple(channels), analysis_period)
             else:
                 st.warning("분석 기간을 선택해주세요.")
                 fig, corr_df = None, None
                 
             if fig is not None:
+                fig.update_layout(uirevision=uirevision)
                 st.plotly_chart(fig, use_container_width=True)
                 
                 # 상관관계 해석
@@ -1196,34 +1429,23 @@ if channels and not filtered_df.empty:
                 
                 with col1:
                     st.markdown("**📊 모든 방송사 간 상관관계**")
-                    
-                    # 상관관계 강도별 색상 표시
-                    def get_correlation_color(corr_val):
-                        abs_corr = abs(corr_val)
-                        if abs_corr >= 0.7:
-                            return "🟢"  # 매우 강함
-                        elif abs_corr >= 0.5:
-                            return "🟡"  # 강함
-                        elif abs_corr >= 0.3:
-                            return "🟠"  # 보통
-                        else:
-                            return "🔴"  # 약함
-                    
-                    for _, row in corr_df.iterrows():
-                        color_indicator = get_correlation_color(row['상관계수'])
-                        st.markdown(f"{color_indicator} **{row['방송사 1']}** ↔ **{row['방송사 2']}**: {row['상관계수']}")
-                            
+
+                    # 상관관계 강도별 색상 표시 (구간 번호로 한 번에 분류, 결측값은 약함)
+                    corr_values = corr_df['상관계수'].to_numpy()
+                    abs_corr = np.abs(corr_values)
+                    strength = np.where(np.isnan(abs_corr), 0, np.digitize(abs_corr, CORRELATION_THRESHOLDS))
+                    color_indicators = CORRELATION_EMOJI[strength]
+
+                    st.markdown("\n\n".join(
+                        f"{color_indicator} **{name1}** ↔ **{name2}**: {corr_val}"
+                        for color_indicator, name1, name2, corr_val in zip(
+                            color_indicators, corr_df['방송사 1'].to_numpy(), corr_df['방송사 2'].to_numpy(), corr_values
+                        )
+                    ))
+
                 with col2:
-                    st.markdown("**📊 상관관계 강도 기준**")
-                    st.markdown("🟢 0.7 이상: 매우 강한 연관성")
-                    st.markdown("🟡 0.5~0.7: 강한 연관성") 
-                    st.markdown("🟠 0.3~0.5: 보통 연관성")
-                    st.markdown("🔴 0.3 미만: 약한 연관성")
-                    
-                    st.markdown("**💡 해석 가이드**")
-                    st.markdown("- 양수: 같은 방향으로 변화")
-                    st.markdown("- 음수: 반대 방향으로 변화")
-                    st.markdown("- 절댓값이 클수록 연관성 강함")
+                    st.markdown(CORRELATION_LEGEND_MD)
+                    st.markdown(CORRELATION_GUIDE_MD)
         else:
             st.warning("상관관계 분석을 위해 최소 2개 방송사를 선택해주세요.")
 
@@ -1238,17 +1460,20 @@ else:
 # 원본 데이터 미리보기
 if not df.empty:
     with st.expander("🔍 원본 데이터 미리보기"):
-        st.dataframe(df.head(10), use_container_width=True)
+        st.dataframe(loading_info['preview'], use_container_width=True, hide_index=True)
 
 # 하단 로딩 정보
 if loading_info and 'encoding' in loading_info:
     st.markdown("---")
     with st.expander("🔧 데이터 로딩 정보"):
-        st.success(f"🔗 구글 시트 접속 완료")
+        if loading_info['from_snapshot']:
+            st.success("💾 로컬 스냅샷에서 불러옴 (구글 시트 접속 생략)")
+        else:
+            st.success("🔗 구글 시트 접속 완료")
         st.success(f"✅ 인코딩 성공: {loading_info['encoding']}")
         st.success(f"✅ 데이터 로드 완료! ({loading_info['rows']}행, {loading_info['columns']}열)")
-        st.info(f"📋 복구된 컬럼들: {loading_info['column_names']}")
+        st.info(f"📋 컬럼 목록: {loading_info['column_names']}")
         st.write(f"📅 날짜 컬럼으로 사용: `{loading_info['date_column']}`")
         st.write(f"📊 숫자 데이터 컬럼들: {loading_info['numeric_columns']}")
         if 'date_range' in loading_info:
-            st.write(f"📆 데이터 범위: {loading_info['date_range'][0].strftime('%Y-%m-%d')} ~ {loading_info['date_range'][1].strftime('%Y-%m-%d')}")
+            st.write(f"📆 데이터 범위: {format_date(loading_info['date_range'][0], '%Y-%m-%d')} ~ {format_date(loading_info['date_range'][1], '%Y-%m-%d')}")